@@ -23,12 +23,17 @@
     specific language governing permissions and limitations
     under the License.
 """
+import os
+import csv
+import math
 import pickle
-import importlib
 import argparse
+from pkgutil import resolve_name
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import numpy as np
-from .job_generation import generate_maxcut_job
+from qat.core import Batch
+from .job_generation import make_job_factory
 from .iterators import Driver
 
 
@@ -38,6 +43,8 @@ _DEFAULT_SIZE_LIMIT = 20
 _DEFAULT_DEPTH = 1
 _DEFAULT_OUT_FILE = "out.csv"
 _DEFAULT_RAW_FILE = "out.raw"
+# layout of the per-instance records stored in the raw output file
+_RAW_DTYPE = np.dtype([("seed", "i8"), ("score", "f8")])
 
 
 _INTRO = """=== Running Q-score benchmark | {date} ===
@@ -80,6 +87,16 @@ class QScore:
         rawdata(str, optional): a file name in which to store the raw output of all the runs
           performed during the benchmark. Default to out.raw.
         seed(int, optional): a seed for the instances generation
+        jobs(int, optional): the number of concurrent job submissions. Instances of a given
+          size are independent, so they can be submitted in parallel. When left unset,
+          batch-capable QPUs get the whole size in a single Batch submission and other
+          executors get one thread per CPU; an explicit value forces per-job submission
+          with that many workers even on batch-capable QPUs (use 1 to submit sequentially,
+          e.g. for QPUs that are not thread-safe).
+        reuse_rawdata(bool, optional): if set, sizes already present in the raw output file
+          of a previous run are not re-evaluated: their scores are recomputed from the
+          stored raw data (e.g. to resume a benchmark with a higher size limit).
+          Default to False.
     """
 
     def __init__(
@@ -93,6 +110,8 @@ class QScore:
         output=_DEFAULT_OUT_FILE,
         rawdata=_DEFAULT_RAW_FILE,
         seed=None,
+        jobs=None,
+        reuse_rawdata=False,
     ):
         self._executor = qpu
         self._size_limit = size_limit
@@ -101,61 +120,96 @@ class QScore:
         self._depth = depth
         self._output = output
         self._rawdata = rawdata
-        self._seed = seed if seed is not None else np.random.randint(100000)
+        self._seed = seed if seed is not None else int(np.random.default_rng().integers(2**63 - 1))
         self._beta = beta
+        self._jobs = jobs
+        self._reuse_rawdata = reuse_rawdata
+
+    def _run_parameters(self):
+        """
+        The run parameters recorded in the raw file's header frame. Raw data
+        can only be reused by a run with identical parameters.
+        """
+        return {"seed": self._seed, "depth": self._depth, "nb_instances": _NB_INSTANCES_PER_SIZE}
+
+    def _load_previous_data(self):
+        """
+        Load the raw data of a previous run (if any) to reuse its evaluations.
+        """
+        if not self._reuse_rawdata or not os.path.exists(self._rawdata):
+            return {}
+        try:
+            header, previous = _load_raw_file(self._rawdata)
+        except (pickle.UnpicklingError, EOFError, KeyError, TypeError, IndexError):
+            print(f"Could not parse {self._rawdata}, ignoring its content.")
+            return {}
+        if header != self._run_parameters():
+            print(f"{self._rawdata} was produced with different run parameters, ignoring its content.")
+            return {}
+        if previous:
+            print(f"Reusing {len(previous)} size(s) already evaluated in {self._rawdata}.")
+        return previous
+
+    def _submit_all(self, jobs):
+        """
+        Submit a list of jobs and return their results (in the same order).
+
+        When no explicit worker count was requested and the executor is a full
+        QPU stack, the jobs are wrapped in a single Batch: this amortizes the
+        per-submission serialization and plugin traversal over the whole
+        batch. An explicit jobs argument wins over the batch heuristic (a
+        Batch executes serially on local simulators), forcing per-job
+        submission with that many concurrent workers, or sequentially for 1.
+        """
+        if self._jobs is None and hasattr(self._executor, "submit_job"):
+            return self._executor.submit(Batch(jobs=jobs)).results
+        workers = self._jobs if self._jobs is not None else os.cpu_count()
+        if workers == 1:
+            return [self._executor.submit(job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self._executor.submit, jobs))
 
     def run(self):
         """
         Runs the benchmark.
         """
-        date_string = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        print(
-            _INTRO.format(
-                date=date_string,
-                init_size=self._initial_size,
-                final_size=self._size_limit,
-                beta=self._beta,
-                depth=self._depth,
-                output=self._output,
-                rawdata=self._rawdata,
-                seed=self._seed,
-            )
-        )
-        all_data = {}
-        seed = self._seed
-        to_output = _HEADER.format(
-            date=date_string,
-            init_size=self._initial_size,
-            beta=self._beta,
-            final_size=self._size_limit,
-            depth=self._depth,
-            output=self._output,
-            rawdata=self._rawdata,
-            seed=self._seed,
-        )
-
-        def _evaluate_point(size, seed=seed, to_output=to_output, self=self):
+        fields = {
+            "date": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
+            "init_size": self._initial_size,
+            "final_size": self._size_limit,
+            "beta": self._beta,
+            "depth": self._depth,
+            "output": self._output,
+            "rawdata": self._rawdata,
+            "seed": self._seed,
+        }
+        print(_INTRO.format(**fields))
+        header = _HEADER.format(**fields)
+
+        def _evaluate_point(size, self=self):
             """
             Function that evaluates a single point.
             """
             print(f"Running for n={size:2d}.", end=" ", flush=True)
-            scores = []
-            data = []
-            for _ in range(_NB_INSTANCES_PER_SIZE):
-                job = generate_maxcut_job(size, self._depth, seed=seed)
-                result = self._executor.submit(job)
-                scores.append(-result.value)
-                data.append({"seed": seed, "score": -result.value})
-                seed += 1
-            average_score = np.mean(scores) - size * (size - 1) / 8
-            avg_best_score = 0.178 * pow(size, 3 / 2)
+            # size-only constants: the random-partition offset and the average best random score
+            random_offset = size * (size - 1) / 8
+            avg_best_score = 0.178 * size * math.sqrt(size)
+            scores = np.empty(_NB_INSTANCES_PER_SIZE)
+            data = np.empty(_NB_INSTANCES_PER_SIZE, dtype=_RAW_DTYPE)
+            # independent, high-quality per-instance seeds, deterministic in (seed, size)
+            children = np.random.SeedSequence(self._seed, spawn_key=(size,)).spawn(_NB_INSTANCES_PER_SIZE)
+            seeds = [int(child.generate_state(1)[0]) for child in children]
+            factory = make_job_factory(size, self._depth)
+            jobs = [factory(instance_seed) for instance_seed in seeds]
+            results = self._submit_all(jobs)
+            for index, result in enumerate(results):
+                scores[index] = -result.value
+                data[index] = (seeds[index], -result.value)
+            average_score = float(scores.sum()) / _NB_INSTANCES_PER_SIZE - random_offset
             print(f"Score: {average_score:.2f}.", end=" ")
             print(f"Random best score: {avg_best_score:.2f}.", end="\t")
-            to_output = f"{size},{average_score},{avg_best_score}\n"
-            all_data[size] = data
-            pickle.dump(all_data, open(self._rawdata, "wb"))
-            with open(self._output, "a") as fout:
-                fout.write(to_output)
+            pickle.dump({"size": size, "data": data}, fraw, protocol=pickle.HIGHEST_PROTOCOL)
+            writer.writerow((size, f"{average_score:.6g}", f"{avg_best_score:.6g}"))
             achieved_ratio = average_score / avg_best_score
             if achieved_ratio > self._beta:
                 print("Success.")
@@ -163,7 +217,29 @@ class QScore:
                 print("Fail.")
             return achieved_ratio - self._beta
 
-        success, _, info = Driver(_evaluate_point, self._iterator, self._initial_size, self._size_limit).run()
+        previous_data = self._load_previous_data()
+
+        with open(self._output, "w", buffering=1 << 20, newline="") as fout, open(self._rawdata, "wb", buffering=1 << 20) as fraw:
+            fout.write(header)
+            pickle.dump(self._run_parameters(), fraw, protocol=pickle.HIGHEST_PROTOCOL)
+            writer = csv.writer(fout)
+            cache = {}
+            for size in sorted(previous_data):
+                data = previous_data[size]
+                average_score = float(np.mean(data["score"])) - size * (size - 1) / 8
+                avg_best_score = 0.178 * size * math.sqrt(size)
+                pickle.dump({"size": size, "data": data}, fraw, protocol=pickle.HIGHEST_PROTOCOL)
+                writer.writerow((size, f"{average_score:.6g}", f"{avg_best_score:.6g}"))
+                cache[size] = average_score / avg_best_score - self._beta
+            # no pruning context here: it would have to identify the full QPU
+            # stack, and pruned sizes would be missing from the output files
+            success, _, info = Driver(
+                _evaluate_point,
+                self._iterator,
+                self._initial_size,
+                self._size_limit,
+                cache=cache,
+            ).run()
 
         if success:
             print(f"Success. QScore({self._beta}) = {info}")
@@ -175,6 +251,39 @@ class QScore:
                 print(f"Failure. QScore({self._beta}) < {info[1]}")
 
 
+def _load_raw_file(filename):
+    """
+    Load a raw data file, returning its header frame (the run parameters, or
+    None for files predating the header) and the map of per-size records.
+    """
+    header = None
+    all_data = {}
+    with open(filename, "rb") as fin:
+        while True:
+            try:
+                frame = pickle.load(fin)
+            except EOFError:
+                return header, all_data
+            if "size" in frame:
+                all_data[frame["size"]] = frame["data"]
+            else:
+                header = frame
+
+
+def load_raw_data(filename):
+    """
+    Load the raw data produced by a benchmark run.
+
+    The raw file starts with a header frame recording the run parameters,
+    followed by one pickled frame per evaluated size. Returns a map
+    associating each evaluated size to its array of (seed, score) records.
+
+    Arguments:
+        filename(str): the raw data file name
+    """
+    return _load_raw_file(filename)[1]
+
+
 _PARSER = argparse.ArgumentParser(prog="qscore")
 _PARSER.add_argument("qpu", type=str, help="The QPU to benchmark in 'module:object' format")
 _PARSER.add_argument(
@@ -209,22 +318,38 @@ _PARSER.add_argument(
     help=("A file name in which to store the raw output of all the runs performed during" " the benchmark. Default to out.raw."),
 )
 _PARSER.add_argument("--seed", type=int, default=None, help="A seed for the instances generation.")
+_PARSER.add_argument(
+    "--reuse",
+    action="store_true",
+    help=(
+        "Reuse the sizes already evaluated in the raw output file of a previous run"
+        " instead of re-evaluating them (e.g. to resume a benchmark with a higher"
+        " size limit)."
+    ),
+)
+_PARSER.add_argument(
+    "--jobs",
+    type=int,
+    default=None,
+    help=(
+        "The number of concurrent job submissions. By default, batch-capable QPUs"
+        " receive each size as a single Batch and other executors use one thread per"
+        " CPU; an explicit value forces per-job submission with that many workers"
+        " even on batch-capable QPUs. Use 1 to submit jobs sequentially (e.g. for"
+        " QPUs that are not thread-safe)."
+    ),
+)
 
 
 def _load_qpu(argument, plugins):
     """
     Load a QPU from its command line argument.
     """
-    module_name, object_name = argument.split(":")
-    module = importlib.import_module(module_name)
-    qpu = module.__dict__[object_name]
+    qpu = resolve_name(argument)
     if isinstance(qpu, type):
         qpu = qpu()
     for plugin in plugins:
-        module_name, object_name = plugin.split(":")
-        module = importlib.import_module(module_name)
-        plugin = module.__dict__[object_name]
-        qpu = plugin | qpu
+        qpu = resolve_name(plugin) | qpu
     return qpu
 
 
@@ -238,4 +363,6 @@ if __name__ == "__main__":
         output=arguments.output,
         rawdata=arguments.rawdata,
         seed=arguments.seed,
+        jobs=arguments.jobs,
+        reuse_rawdata=arguments.reuse,
     ).run()
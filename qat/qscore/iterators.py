@@ -23,49 +23,146 @@
     specific language governing permissions and limitations
     under the License.
 """
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 
 
-def _exhaustive(start_size, end_size):
+class _ExhaustiveSearch:
     """
     Iterates over all the values of the domain until it finds a negative value.
     """
-    values = dict()
+
+    __slots__ = ("_start_size", "_end_size", "_index", "_vals", "result")
+
+    def __init__(self, start_size, end_size):
+        self._start_size = start_size
+        self._end_size = end_size
+        self._index = start_size
+        self._vals = np.full(end_size - start_size + 1, np.nan)
+        self.result = None
+
+    def next_index(self):
+        """
+        Returns the next index to evaluate, or None if the search is over.
+        """
+        return None if self.result is not None else self._index
+
+    def _history(self):
+        """
+        Builds the map<index, value> of the evaluated points.
+        """
+        evaluated = np.nonzero(~np.isnan(self._vals))[0]
+        return {self._start_size + int(offset): float(self._vals[offset]) for offset in evaluated}
+
+    def submit(self, value):
+        """
+        Feeds the value of the last returned index and advances the search.
+        """
+        index = self._index
+        self._vals[index - self._start_size] = value
+        if value < 0:
+            if index == self._start_size:
+                self.result = (False, self._history(), (False, self._start_size))
+            else:
+                self.result = (True, self._history(), index - 1)
+        elif index == self._end_size:
+            self.result = (False, self._history(), (True, index, value))
+        else:
+            self._index = index + 1
+
+
+class _DichotomicSearch:
+    """
+    Evaluates both endpoints of the domain, then bisects until the interval
+    between the last positive and first negative values has length 1.
+    """
+
+    __slots__ = ("_start_size", "_lower", "_upper", "_index", "_bracketing", "_lower_val", "_vals", "result")
+
+    def __init__(self, start_size, end_size):
+        self._start_size = start_size
+        self._lower = start_size
+        self._upper = end_size
+        self._index = start_size
+        self._bracketing = True
+        self._lower_val = None
+        self._vals = np.full(end_size - start_size + 1, np.nan)
+        self.result = None
+
+    def next_index(self):
+        """
+        Returns the next index to evaluate, or None if the search is over.
+        """
+        return None if self.result is not None else self._index
+
+    def bracket(self):
+        """
+        Returns the (lower, upper) endpoints if neither has been evaluated
+        yet, or None. The two evaluations are independent, so a driver may
+        dispatch them as a batch before entering the bisection.
+        """
+        if self._bracketing and self._index == self._lower:
+            return self._lower, self._upper
+        return None
+
+    def _history(self):
+        """
+        Builds the map<index, value> of the evaluated points.
+        """
+        evaluated = np.nonzero(~np.isnan(self._vals))[0]
+        return {self._start_size + int(offset): float(self._vals[offset]) for offset in evaluated}
+
+    def submit(self, value):
+        """
+        Feeds the value of the last returned index and advances the search.
+        """
+        index = self._index
+        self._vals[index - self._start_size] = value
+        if self._bracketing:
+            if index == self._lower and self._lower != self._upper:
+                self._lower_val = value
+                self._index = self._upper
+                return
+            # the value just submitted is the upper endpoint's
+            self._bracketing = False
+            lower_val = value if self._lower == self._upper else self._lower_val
+            if value > 0:
+                self.result = (False, self._history(), (True, self._upper, value))
+                return
+            if lower_val < 0:
+                self.result = (False, self._history(), (False, self._lower))
+                return
+        elif value < 0:
+            self._upper = index
+        else:
+            self._lower = index
+        if abs(self._upper - self._lower) <= 1:
+            self.result = (True, self._history(), self._lower)
+        else:
+            self._index = (self._upper + self._lower) // 2
+
+
+def _run_exhaustive(fun, start_size, end_size):
+    """
+    Straight-line fast path for the exhaustive iteration: a plain loop with
+    no per-step search-object calls. Returns the same tuple as Driver.run.
+    """
+    values = {}
+    value = None
     for index in range(start_size, end_size + 1):
-        value = yield index
+        value = fun(index)
         values[index] = value
         if value < 0:
             if index == start_size:
-                return False, value, (False, start_size)
+                return False, values, (False, start_size)
             return True, values, index - 1
-    return False, values, (True, max(values), values[max(values)])
-
-
-def _dichotomic(start_size, end_size):
-    """"""
-    lower = start_size
-    upper = end_size
-    value = yield lower
-    values = dict()
-    values[lower] = value
-    value = yield upper
-    values[upper] = value
-
-    if values[upper] > 0:
-        return False, values, (True, max(values), values[max(values)])
-    if values[lower] < 0:
-        return False, value, (False, start_size)
-    while True:
-        if abs(upper - lower) <= 1:
-            return True, values, lower
-        next_index = (upper + lower) // 2
-        values[next_index] = yield next_index
-        if values[next_index] < 0:
-            upper = next_index
-        else:
-            lower = next_index
+    return False, values, (True, end_size, value)
+
 
+SEARCHES = {"exhaustive": _ExhaustiveSearch, "dichotomic": _DichotomicSearch}
 
-GENERATORS = {"exhaustive": _exhaustive, "dichotomic": _dichotomic}
+# smallest index observed negative, per search context (see Driver)
+_KNOWN_NEGATIVE = {}
 
 
 class Driver:
@@ -78,13 +175,35 @@ class Driver:
         iteration(str): either "exhaustive" or "dichotomic"
         start_size(int): the start size (i.e the lowest index)
         end_size(int): the end size (i.e the highest index)
+        cache(dict, optional): a map<index, value> of already known values.
+          Cached indices are fed to the search without calling the evaluation
+          function (e.g. to reuse points evaluated by a previous run).
+        context(hashable, optional): an identifier of the evaluation function.
+          When set, indices at or above an index already observed negative for
+          the same context are pruned: they are fed -inf without being
+          evaluated, and their values never reach the evaluation function.
+          This leans on the monotonicity assumption the dichotomic search
+          already makes, and the context must capture everything the function
+          depends on (e.g. the full QPU stack and threshold, not just the
+          instance parameters): two functions sharing a context share their
+          pruning decisions. Pruning is off when no context is given.
+        fun_batch(callable, optional): a batched version of the evaluation
+          function, taking a sequence of indices and returning their values in
+          order (e.g. a parallel map). When provided, the two independent
+          endpoint evaluations of the dichotomic bracketing are dispatched
+          through it in a single call.
     """
 
-    def __init__(self, fun, iteration, start_size, end_size):
-        if iteration not in GENERATORS:
+    __slots__ = ("search", "fun", "cache", "context", "fun_batch")
+
+    def __init__(self, fun, iteration, start_size, end_size, cache=None, context=None, fun_batch=None):
+        if iteration not in SEARCHES:
             raise ValueError(f"Unknown iteration method {iteration}")
-        self.generator = GENERATORS[iteration](start_size, end_size)
+        self.search = SEARCHES[iteration](start_size, end_size)
         self.fun = fun
+        self.cache = dict(cache) if cache else {}
+        self.context = context
+        self.fun_batch = fun_batch
 
     def run(self):
         """
@@ -93,9 +212,66 @@ class Driver:
         - a map<index, value> containing all the evaluated point
         - if found, the index such that f(index) > 0 and f(index + 1) <= 0
         """
-        index = next(self.generator)
-        while True:
-            try:
-                index = self.generator.send(self.fun(index))
-            except StopIteration as exp:
-                return exp.value
+        search = self.search
+        cache = self.cache
+        fun = self.fun
+        context = self.context
+        if isinstance(search, _ExhaustiveSearch) and not cache and context is None:
+            return _run_exhaustive(fun, search._start_size, search._end_size)
+        threshold = _KNOWN_NEGATIVE.get(context) if context is not None else None
+        next_index = search.next_index
+        submit = search.submit
+        if self.fun_batch is not None:
+            bracket = getattr(search, "bracket", lambda: None)()
+            if bracket is not None:
+                lower, upper = bracket
+                if lower != upper and lower not in cache and upper not in cache and (threshold is None or upper < threshold):
+                    for batch_index, value in zip(bracket, self.fun_batch(bracket)):
+                        if value < 0 and context is not None:
+                            threshold = batch_index if threshold is None else min(threshold, batch_index)
+                            _KNOWN_NEGATIVE[context] = threshold
+                        submit(value)
+        index = next_index()
+        while index is not None:
+            if index in cache:
+                value = cache[index]
+            elif threshold is not None and index >= threshold:
+                value = float("-inf")
+            else:
+                value = fun(index)
+                if value < 0 and context is not None:
+                    threshold = index if threshold is None else min(threshold, index)
+                    _KNOWN_NEGATIVE[context] = threshold
+            submit(value)
+            index = next_index()
+        return search.result
+
+    def run_parallel(self, max_workers=None):
+        """
+        Runs the iteration, evaluating points speculatively in parallel.
+
+        For the exhaustive iteration, the indices to visit are known a priori:
+        all points are dispatched at once to a thread pool and their values fed
+        to the search in order (points beyond the stopping index are evaluated
+        speculatively, and cancelled when still pending once the search ends).
+        Iterations whose next index depends on the previous value (dichotomic)
+        fall back to the serial run. Returns the same tuple as run.
+        """
+        search = self.search
+        if not isinstance(search, _ExhaustiveSearch):
+            return self.run()
+        cache = self.cache
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = {
+                index: pool.submit(self.fun, index)
+                for index in range(search._start_size, search._end_size + 1)
+                if index not in cache
+            }
+            index = search.next_index()
+            while index is not None:
+                search.submit(cache[index] if index in cache else futures[index].result())
+                index = search.next_index()
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+        return search.result
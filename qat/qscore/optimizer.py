@@ -21,15 +21,47 @@
     specific language governing permissions and limitations
     under the License.
 """
-from qat.plugins import ScipyMinimizePlugin
+import os
 
 
-OPTIMIZER = ScipyMinimizePlugin(
-    method="COBYLA",
-    tol=1e-5,
-    options={
-        "maxiter": 300
-    }
-)
+def build_optimizer(method=None, tol=1e-3, maxiter=150):
+    """
+    Build a variational optimizer plugin for the benchmark.
+
+    The defaults are sized for the Q-score QAOA landscapes: COBYLA typically
+    plateaus well before 300 iterations, and every extra iteration is a full
+    circuit simulation, so the iteration budget and the tolerance are the main
+    wall-clock levers of a run.
+
+    Arguments:
+        method(str, optional): the scipy.optimize.minimize method. Default to
+          the QSCORE_OPTIMIZER environment variable if set, COBYLA otherwise,
+          so an alternative optimizer can be tried without touching the code
+          building the stack.
+        tol(float, optional): the termination tolerance. Default to 1e-3.
+        maxiter(int, optional): the iteration budget. Default to 150.
+    """
+    if method is None:
+        method = os.environ.get("QSCORE_OPTIMIZER", "COBYLA")
+    # deferred so that importing this module stays cheap (see __getattr__)
+    from qat.plugins import ScipyMinimizePlugin
+
+    return ScipyMinimizePlugin(method=method, tol=tol, options={"maxiter": maxiter})
+
+
+_OPTIMIZER = None
+
+
+def __getattr__(name):
+    """
+    Lazily build the default OPTIMIZER on first access (PEP 562), so that
+    importing this module does not pay for the plugin construction.
+    """
+    global _OPTIMIZER  # pylint: disable=global-statement
+    if name == "OPTIMIZER":
+        if _OPTIMIZER is None:
+            _OPTIMIZER = build_optimizer()
+        return _OPTIMIZER
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 